@@ -1,12 +1,15 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
+from concurrent.futures import Future
 from langgraph.graph import StateGraph, END
-from .models import ResearchState, Paper
+from .models import ResearchState, Paper, PaperStore
 from .fetcher import ContentFetcher
 from .embeddings import Embedder
 from .rag import RAGClient
-from .config import SIMILARITY_THRESHOLD, MAX_DEPTH, MAX_SEARCH_RESULTS
+from .config import SIMILARITY_THRESHOLD, MAX_DEPTH, MAX_SEARCH_RESULTS, EXPAND_BATCH_SIZE
+import asyncio
 import logging
 import time
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,7 @@ class ResearchGraph:
         self.rag = RAGClient()
         self.workflow = StateGraph(ResearchState)
         self._build_graph()
+        self._compiled = None
 
     def _build_graph(self):
         # Add Nodes
@@ -42,11 +46,47 @@ class ResearchGraph:
         self.workflow.add_edge("synthesize_node", END)
 
     def compile(self):
-        return self.workflow.compile()
+        # Compile once and reuse; run with `ainvoke`, the nodes are async
+        if self._compiled is None:
+            self._compiled = self.workflow.compile()
+        return self._compiled
+
+    def _build_papers(self, raw_papers: List[Dict], query_vector: np.ndarray) -> Tuple[Dict[str, Paper], np.ndarray]:
+        """
+        Convert raw fetcher results into Paper objects, embedding all abstracts in one batch.
+        Returns the papers plus their (N,) relevance scores, row-aligned with the dict order.
+        """
+        raw_papers = list({p['id']: p for p in raw_papers}.values())
+
+        # If no abstract, still keep the paper but give it a low relevance score
+        scores = np.full(len(raw_papers), 0.1, dtype=np.float32)
+
+        with_abs = [i for i, p in enumerate(raw_papers) if p.get('abstract')]
+        if with_abs:
+            vecs = self.embedder.embed_batch([raw_papers[i]['abstract'] for i in with_abs])
+            if len(vecs) == len(with_abs):
+                scores[with_abs] = self.embedder.cosine_batch(query_vector, vecs)
+            else:
+                scores[with_abs] = 0.0  # Embedding model unavailable
+
+        new_papers = {}
+        for p, score in zip(raw_papers, scores):
+            new_papers[p['id']] = {
+                'id': p['id'],
+                'title': p.get('title', ''),
+                'abstract': p.get('abstract') or "",
+                'authors': p.get('authors', []),
+                'year': p.get('year'),
+                'citation_count': p.get('citationCount', 0),
+                'url': p.get('url', ''),
+                'relevance_score': float(score),
+                'summary': ""
+            }
+        return new_papers, scores
 
     # --- Node Implementations ---
     
-    def synthesize_node(self, state: ResearchState) -> Dict:
+    async def synthesize_node(self, state: ResearchState) -> Dict:
         """Use LLM to summarize findings."""
         logger.info("Node: Synthesize")
         papers = state.get('papers', {})
@@ -58,12 +98,12 @@ class ResearchGraph:
         # Sort by relevance
         paper_list.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
         
-        summary = self.rag.summarize_papers(paper_list, query)
+        summary = await self.rag.asummarize(paper_list, query)
         
         return {"summary": summary}
 
 
-    def search_seeds(self, state: ResearchState) -> Dict:
+    async def search_seeds(self, state: ResearchState) -> Dict:
         """Initial search for seed papers."""
         logger.info("Node: Search Seeds")
         query = state.get('query', '')
@@ -74,177 +114,152 @@ class ResearchGraph:
             start_time = time.time()
         
         # Generate query vector if not present
-        if not state.get('query_vector'):
-            state['query_vector'] = self.embedder.embed(query)
+        query_vector = state.get('query_vector')
+        if query_vector is None or not len(query_vector):
+            query_vector = await asyncio.to_thread(self.embedder.embed, query)
         
-        query_vector = state['query_vector']
-        if not query_vector:
+        # Normalize once so every later relevance score is a plain dot product
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        query_vector = query_vector / (np.linalg.norm(query_vector) + 1e-12)
+        if not len(query_vector):
             raise RuntimeError(
                 "Embedding model failed to produce a query vector. "
                 "Check that the embedding model loaded correctly."
             )
 
         # Fetch seeds — this now raises on total failure instead of silently returning []
-        raw_papers = self.fetcher.search(query, limit=MAX_SEARCH_RESULTS)
+        raw_papers = await self.fetcher.search_async(query, limit=MAX_SEARCH_RESULTS)
         
         if not raw_papers:
             logger.warning("Search returned 0 papers. The query may be too specific or the API returned no results.")
         
-        # Convert to Paper objects
-        new_papers = {}
-        skipped = 0
-        for p in raw_papers:
-            abstract = p.get('abstract', '')
-            
-            # If no abstract, still keep the paper but give it a low relevance score
-            if not abstract:
-                skipped += 1
-                paper_obj: Paper = {
-                    'id': p['id'],
-                    'title': p['title'],
-                    'abstract': "",
-                    'authors': p.get('authors', []),
-                    'year': p.get('year'),
-                    'citation_count': p.get('citationCount', 0),
-                    'url': p.get('url', ''),
-                    'vector': [],
-                    'relevance_score': 0.1,  # Low default score
-                    'summary': ""
-                }
-                new_papers[p['id']] = paper_obj
-                continue
-            
-            # Embed paper abstract and score relevance
-            vec = self.embedder.embed(abstract)
-            sim = self.embedder.similarity(query_vector, vec)
-            
-            paper_obj: Paper = {
-                'id': p['id'],
-                'title': p['title'],
-                'abstract': abstract,
-                'authors': p.get('authors', []),
-                'year': p.get('year'),
-                'citation_count': p.get('citationCount', 0),
-                'url': p.get('url', ''),
-                'vector': vec,
-                'relevance_score': sim,
-                'summary': ""
-            }
-            new_papers[p['id']] = paper_obj
+        # Papers already in state (re-run / refined query) keep their rows; only new ones get embedded
+        known = state.get('papers', {})
+        fresh = [p for p in raw_papers if p['id'] not in known]
+
+        # The first expansion picks from these seeds, so fetch their references while they are embedded
+        seed_ids = [p['id'] for p in raw_papers]
+        prefetched = self._prefetch(seed_ids, {**known, **dict.fromkeys(seed_ids)})
+
+        # Convert to Paper objects (papers without abstracts are kept with a low score)
+        new_papers, scores = await asyncio.to_thread(
+            self._build_papers, fresh, query_vector
+        )
+        skipped = sum(1 for p in fresh if not p.get('abstract'))
         
         logger.info(
-            f"Seed search produced {len(new_papers)} papers "
-            f"({skipped} without abstracts)."
+            f"Seed search produced {len(new_papers)} new papers "
+            f"({skipped} without abstracts, {len(raw_papers) - len(fresh)} already known)."
         )
+
+        store = state.get('store')
+        if store is None:
+            store = PaperStore()
+        store.add(list(new_papers.keys()), scores)
             
         return {
+            "query_vector": query_vector,
             "papers": new_papers,
-            "queue": list(new_papers.keys()),
-            "visited_ids": set(),
+            "store": store,
+            "prefetched": prefetched,
             "current_depth": 0,
             "start_time": start_time
         }
 
-    def expand_node(self, state: ResearchState) -> Dict:
-        """Expand the most relevant unvisited paper."""
+    async def _fetch_reference_ids(self, paper_ids: List[str], known: Dict[str, Paper]) -> List[str]:
+        """Fetch details for several papers in one request and return their new reference IDs."""
+        details_list = await self.fetcher.get_batch_details_async(paper_ids, need_references=True)
+
+        # Limit to top 5 references per paper to save time/quota; dedupe across papers
+        ref_ids = dict.fromkeys(ref for d in details_list for ref in d.get('references', [])[:5])
+        return [ref for ref in ref_ids if ref not in known]
+
+    async def _fetch_references(self, paper_ids: List[str], known: Dict[str, Paper]) -> List[Dict]:
+        """Fetch details for several papers, then all their new references in one more request."""
+        ref_ids = await self._fetch_reference_ids(paper_ids, known)
+        if not ref_ids:
+            return []
+        return await self.fetcher.get_batch_details_async(ref_ids)
+
+    async def _fetch_and_embed(self, ref_ids: List[str], known: Dict[str, Paper], query_vector: np.ndarray):
+        """
+        Fetch the references in one batch call (the fetcher splits it at the API limit), then embed
+        and score them off the event loop.
+        Returns the same tuple as `_build_papers`.
+        """
+        raw_refs = await self.fetcher.get_batch_details_async(ref_ids)
+        raw_refs = [p for p in raw_refs if p['id'] not in known]  # Skip ones we already have
+        # Embedding is CPU-bound, the embedder batches it in EMBED_BATCH_SIZE chunks
+        return await asyncio.to_thread(self._build_papers, raw_refs, query_vector)
+
+    def _prefetch(self, paper_ids: List[str], known: Dict[str, Paper]) -> Optional[Future]:
+        """
+        Warm the fetcher cache for the seeds' references, on the fetcher's I/O loop.
+        Returns the handle for the run's state (it is per run, the graph object is shared across sessions).
+        """
+        if not paper_ids:
+            return None
+        known = set(known)  # Snapshot, the caller keeps mutating its dict
+        return self.fetcher.submit(self._fetch_references(paper_ids, known))
+
+    async def _wait_for_prefetch(self, future: Optional[Future]):
+        """Wait until this run's in-flight prefetch is done, so we don't issue the same requests twice."""
+        if future is None:
+            return
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.warning(f"Prefetch failed ({e}), fetching on demand.")
+
+    async def expand_node(self, state: ResearchState) -> Dict:
+        """Expand the top-K most relevant unvisited papers in one step."""
         logger.info("Node: Expand")
-        queue = state.get('queue', [])
-        visited = state.get('visited_ids', set())
+        store = state['store']
         papers = state.get('papers', {})
-        query_vector = state.get('query_vector', [])
+        query_vector = state.get('query_vector', np.empty(0, dtype=np.float32))
         
-        # Get next paper from queue that hasn't been visited
-        current_id = None
-        for pid in queue:
-            if pid not in visited:
-                current_id = pid
-                break
+        # filter_node already picked the rows of the top-K unvisited papers
+        rows = state.get('next_batch', [])
         
-        if not current_id:
-            return {"queue": []}  # Nothing left to expand
+        if not rows:
+            return {"next_batch": []}  # Nothing left to expand
             
         # Mark as visited
-        visited.add(current_id)
-        logger.info(f"Expanding paper: {papers.get(current_id, {}).get('title', current_id)}")
+        store.mark_visited(rows)
+        batch = [store.ids[i] for i in rows]
+        for pid in batch:
+            logger.info(f"Expanding paper: {papers.get(pid, {}).get('title', pid)}")
         
-        # Fetch details (references)
-        details = self.fetcher.get_details(current_id)
-        if not details or not details.get('references'):
-            return {"visited_ids": visited}
-            
-        # Fetch data for references (Limit to top 5 to save time/quota)
-        ref_ids = details['references'][:5] 
-        new_raw_papers = self.fetcher.get_batch_details(ref_ids)
-        
-        new_papers = {}
-        for p in new_raw_papers:
-            if p['id'] in papers: continue  # Already have it
-            abstract = p.get('abstract', '')
-            
-            if not abstract:
-                # Keep paper with low score
-                paper_obj: Paper = {
-                    'id': p['id'],
-                    'title': p.get('title', ''),
-                    'abstract': "",
-                    'authors': p.get('authors', []),
-                    'year': p.get('year'),
-                    'citation_count': p.get('citationCount', 0),
-                    'url': p.get('url', ''),
-                    'vector': [],
-                    'relevance_score': 0.1,
-                    'summary': ""
-                }
-                new_papers[p['id']] = paper_obj
-                continue
-            
-            # Embed
-            vec = self.embedder.embed(abstract)
-            sim = self.embedder.similarity(query_vector, vec)
-            
-            paper_obj: Paper = {
-                'id': p['id'],
-                'title': p.get('title', ''),
-                'abstract': abstract,
-                'authors': p.get('authors', []),
-                'year': p.get('year'),
-                'citation_count': p.get('citationCount', 0),
-                'url': p.get('url', ''),
-                'vector': vec,
-                'relevance_score': sim,
-                'summary': ""
-            }
-            new_papers[p['id']] = paper_obj
+        # Fetch details (references) for the whole batch at once. The first expansion picks from the
+        # seeds, whose references search_seeds prefetched while embedding them; later ones fetch on demand
+        await self._wait_for_prefetch(state.get('prefetched'))
+        ref_ids = await self._fetch_reference_ids(batch, papers)  # Skips ones we already have
+        depth = state.get('current_depth', 0) + 1
 
-        # Merge
-        papers.update(new_papers)
-        
-        # Update queue (add new papers)
-        new_queue = list(queue) + list(new_papers.keys())
+        if not ref_ids:
+            return {"current_depth": depth, "prefetched": None}
+
+        # Fetch the new references in one batch, then embed and score them
+        new_papers, new_scores = await self._fetch_and_embed(ref_ids, papers, query_vector)
+
+        # New rows go into the store; only the new papers are returned, the reducer merges them in
+        store.add(list(new_papers.keys()), new_scores)
         
         logger.info(f"Expand added {len(new_papers)} new papers.")
         
         return {
-            "papers": papers,
-            "queue": new_queue,
-            "visited_ids": visited,
-            "current_depth": state.get('current_depth', 0) + 1
+            "papers": new_papers,
+            "store": store,
+            "prefetched": None,  # Consumed above
+            "current_depth": depth
         }
 
-    def filter_node(self, state: ResearchState) -> Dict:
-        """Re-rank the queue based on relevance."""
+    async def filter_node(self, state: ResearchState) -> Dict:
+        """Pick the most relevant unvisited papers to expand next."""
         logger.info("Node: Filter & Rank")
-        papers = state['papers']
-        queue = state['queue']
-        
-        # Remove papers from queue that aren't in our papers dict (safety check)
-        queue = [pid for pid in queue if pid in papers]
-        
-        # Sort queue by relevance score of the papers
-        # High relevance first
-        queue.sort(key=lambda pid: papers[pid].get('relevance_score', 0), reverse=True)
+        next_batch = state['store'].top_unvisited(EXPAND_BATCH_SIZE)
         
-        return {"queue": queue}
+        return {"next_batch": next_batch}
 
     def should_continue(self, state: ResearchState):
         """Decide whether to stop or continue."""
@@ -257,7 +272,7 @@ class ResearchGraph:
 
         if state['current_depth'] >= MAX_DEPTH:
             return "stop"
-        if not state['queue']:
+        if not state.get('next_batch'):
             return "stop"
         
         return "continue"
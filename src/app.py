@@ -4,6 +4,7 @@ from pyvis.network import Network
 import streamlit.components.v1 as components
 import sys
 import os
+import asyncio
 import logging
 
 # Add project root to path so we can import packages from src
@@ -48,14 +49,12 @@ if st.button("Generate Graph"):
                 initial_state = {
                     "query": query,
                     "current_depth": 0,
-                    "visited_ids": set(),
-                    "queue": [],
                     "papers": {},
                     "max_duration": max_duration
                 }
                 
                 st.write("🔍 Searching for seed papers via Semantic Scholar...")
-                final_state = research_graph.compile().invoke(initial_state)
+                final_state = asyncio.run(research_graph.compile().ainvoke(initial_state))
                 st.write("✅ Research complete!")
                 status.update(label="Research Complete!", state="complete", expanded=False)
             except RuntimeError as e:
@@ -123,12 +122,8 @@ if st.button("Generate Graph"):
                 net.from_nx(G)
                 net.repulsion(node_distance=100, spring_length=200)
                 
-                # Save and read
-                path = "graph.html"
-                net.save_graph(path)
-                
-                with open(path, 'r', encoding='utf-8') as f:
-                    source_code = f.read()
+                # Render in memory (no shared graph.html on disk between sessions)
+                source_code = net.generate_html(notebook=False)
                 components.html(source_code, height=600)
                 
                 # Show Details
@@ -11,13 +11,21 @@ EMBEDDINGS_CACHE_PATH = DATA_DIR / "embeddings.npy"
 DATA_DIR.mkdir(exist_ok=True)
 
 # Model Config
-EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_MODEL_NAME = "BAAI/bge-small-en-v1.5"  # Very fast and good semantic search
 LLM_MODEL_NAME = "gemini-1.5-flash"
+EMBEDDING_PROVIDERS = ["CUDAExecutionProvider", "CPUExecutionProvider"]  # ONNX Runtime providers, in preference order
 
 # Search Config
 MAX_SEARCH_RESULTS = 10
 SIMILARITY_THRESHOLD = 0.5  # Cosine similarity threshold for relevance
 MAX_DEPTH = 2  # How many hops from the original paper
+EXPAND_BATCH_SIZE = min(8, MAX_SEARCH_RESULTS)  # Frontier papers expanded per graph step
+EMBED_BATCH_SIZE = 32  # Abstracts embedded per model call
+
+# RAG Config
+RAG_MAX_PAPERS = 10  # Papers included in the synthesis prompt
+RAG_ABSTRACT_CHARS = 1200  # Abstracts are truncated to this many characters to bound prompt size
 
 # API Config
 SEMANTIC_SCHOLAR_RATE_LIMIT = 1.0  # Seconds between requests (S2 public API allows ~100 req/5min)
+S2_MAX_CONCURRENCY = 8  # Max in-flight Semantic Scholar requests for async fetches
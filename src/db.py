@@ -0,0 +1,115 @@
+import atexit
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Applied to every cache connection, after the journal mode. WAL (the default) lets readers and
+# the writer work concurrently, and synchronous=NORMAL only fsyncs at checkpoints, which is safe in WAL mode.
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+CACHE_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+"""
+
+# SQLite's default limit on bound parameters per statement
+SQLITE_MAX_VARS = 999
+
+# Connections opened by `connect` and not yet closed; whatever is left gets closed at exit.
+# Holds the connections only (they can't be weakly referenced), never their owners.
+_open_connections = set()
+
+
+def connect(path, journal_mode: str = "WAL") -> sqlite3.Connection:
+    """
+    Open a cache DB connection shareable across threads (callers hold their own lock).
+    Autocommit mode: single statements commit themselves, multi-row writes use `transaction`.
+    Pass `journal_mode="MEMORY"` (or path ":memory:") for throwaway caches in tests and scripts.
+    """
+    journal_mode = journal_mode.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal mode: {journal_mode}")
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.executescript(CACHE_PRAGMAS)
+    _open_connections.add(conn)
+    return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """Run the enclosed statements in one explicit transaction (one commit, one WAL sync)."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        # Inside the try: a failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open, so roll it back
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def close(conn: sqlite3.Connection):
+    """Let SQLite refresh its query planner stats, then close. Closing twice is a no-op."""
+    if conn not in _open_connections:
+        return
+    _open_connections.discard(conn)
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+@atexit.register
+def _close_all():
+    """Close every connection still open at exit (the fetcher's and the embedder's), so each gets `PRAGMA optimize`."""
+    for conn in list(_open_connections):
+        try:
+            close(conn)
+        except sqlite3.Error:
+            pass  # Already unusable; nothing left to flush
+
+
+def select_in(conn: sqlite3.Connection, sql: str, ids: List[str]) -> List[tuple]:
+    """
+    Run `sql` with its `{}` replaced by an IN placeholder list, in chunks of SQLITE_MAX_VARS ids.
+    Returns the rows of all chunks; any ORDER BY applies within a chunk.
+    """
+    rows = []
+    for i in range(0, len(ids), SQLITE_MAX_VARS):
+        chunk = ids[i:i + SQLITE_MAX_VARS]
+        rows.extend(conn.execute(sql.format(",".join("?" * len(chunk))), chunk).fetchall())
+    return rows
+
+
+class LRUCache:
+    """Bounded in-memory LRU kept in front of a cache table. Not thread-safe: callers hold their own lock."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached value (now most recently used), or None."""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def update(self, items: Dict[str, Any]):
+        """Insert or refresh entries, evicting the least recently used beyond `maxsize`."""
+        for key, value in items.items():
+            self._data[key] = value
+            self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
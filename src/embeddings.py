@@ -1,51 +1,240 @@
 from fastembed import TextEmbedding
 import numpy as np
+import hashlib
 import logging
-from .config import EMBEDDING_MODEL_NAME
+import threading
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+import onnxruntime as ort
+from . import db
+from .config import EMBEDDING_MODEL_NAME, EMBEDDING_PROVIDERS, CACHE_DB_PATH, EMBED_BATCH_SIZE
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long the micro-batcher waits for more `embed` calls to join a batch
+MICRO_BATCH_WAIT = 0.005  # seconds
+
+# Vectors kept in memory in front of the SQLite cache (LRU)
+MEMORY_CACHE_SIZE = 4096
+
+def quantize_int8(M: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize the rows of M to int8 with a symmetric per-row scale.
+    Returns the (N, D) int8 matrix and the (N,) float32 scales; row i ~= q[i] * scales[i].
+    """
+    scales = np.abs(M).max(axis=1, initial=0.0) / 127.0
+    scales[scales == 0] = 1.0  # All-zero rows stay zero
+    q = np.round(M / scales[:, None]).astype(np.int8)
+    return q, scales.astype(np.float32)
+
+def _onnx_parts(model: TextEmbedding):
+    """fastembed's ONNX session and tokenizer (internals, so either may be None if they move)."""
+    inner = getattr(model, "model", None)
+    return getattr(inner, "model", None), getattr(inner, "tokenizer", None)
+
+def load_model(model_name: str = EMBEDDING_MODEL_NAME) -> TextEmbedding:
+    """Load the model on the first available provider in EMBEDDING_PROVIDERS (GPU if onnxruntime-gpu is installed)."""
+    available = ort.get_available_providers()
+    providers = [p for p in EMBEDDING_PROVIDERS if p in available] or ["CPUExecutionProvider"]
+    try:
+        model = TextEmbedding(model_name=model_name, providers=providers)
+    except Exception as e:
+        if providers == ["CPUExecutionProvider"]:
+            raise
+        logger.warning(f"Could not load embedding model on {providers}, falling back to CPU: {e}")
+        providers = ["CPUExecutionProvider"]
+        model = TextEmbedding(model_name=model_name, providers=providers)
+    # ONNX Runtime drops providers it can't initialise (e.g. CUDA without its libraries) without
+    # raising, so report what the session actually bound rather than what we asked for
+    session, _ = _onnx_parts(model)
+    if session is not None:
+        logger.info(f"Embedding model running on: {', '.join(session.get_providers())}")
+    else:
+        logger.info(f"Embedding model requested providers: {', '.join(providers)}")
+    return model
+
 class Embedder:
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Embedder, cls).__new__(cls)
+            cls._instance._init_cache()
+            cls._instance._start_batcher()
             try:
                 # FastEmbed uses a different model name format, but handles mapping internally
-                model_name = "BAAI/bge-small-en-v1.5" # Very fast and good semantic search
+                model_name = EMBEDDING_MODEL_NAME
                 logger.info(f"Loading embedding model: {model_name}...")
-                cls._instance.model = TextEmbedding(model_name=model_name)
+                cls._instance.model = load_model(model_name)
+                cls._instance._bind_onnx()
+                # Warm-up pass so ONNX Runtime's lazy graph setup isn't paid by the first real query
+                cls._instance._encode(["warmup"])
                 logger.info("Model loaded successfully.")
             except Exception as e:
                 logger.error(f"Failed to load embedding model: {e}")
                 cls._instance.model = None
         return cls._instance
 
-    def embed(self, text: str) -> list[float]:
-        """Generate a vector embedding for the given text."""
-        if not text or not self.model:
-            return []
-        
-        # fastembed returns a generator, convert to list
-        # It handles batch processing efficiently
-        embeddings = list(self.model.embed([text]))
-        return embeddings[0].tolist()
-
-    def similarity(self, v1: list[float], v2: list[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        if not v1 or not v2:
-            return 0.0
-        
-        # Use numpy for fast cosine similarity
-        vec1 = np.array(v1)
-        vec2 = np.array(v2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
+    def _bind_onnx(self):
+        """
+        Grab fastembed's ONNX session and tokenizer so `_encode` can call them directly.
+        These are fastembed internals; if they move, we fall back to `model.embed`.
+        """
+        self._session, self._tokenizer = _onnx_parts(self.model)
+        if self._session is None or self._tokenizer is None:
+            logger.info("fastembed internals not found, using TextEmbedding.embed.")
+            self._session = self._tokenizer = None
+            return
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Run the model on `texts`, returning raw (unnormalized) (N, D) float32 embeddings."""
+        if self._session is None:
+            return np.asarray(list(self.model.embed(texts, batch_size=EMBED_BATCH_SIZE)), dtype=np.float32)
+
+        out = []
+        for i in range(0, len(texts), EMBED_BATCH_SIZE):
+            # fastembed configures the tokenizer to truncate to 512 and pad to the longest text
+            encoded = self._tokenizer.encode_batch(texts[i:i + EMBED_BATCH_SIZE])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            feeds = {
+                "input_ids": input_ids,
+                "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            hidden = self._session.run(None, feeds)[0]
+            # BGE embeds with the [CLS] token, same as fastembed's post-processing
+            out.append(hidden[:, 0])
+        return np.concatenate(out).astype(np.float32)
+
+    def _init_cache(self):
+        """Initialize the persistent embedding cache (lives in the paper cache DB) and its in-memory LRU."""
+        self._lock = threading.Lock()
+        self._mem_cache = db.LRUCache(MEMORY_CACHE_SIZE)
+        self.conn = db.connect(CACHE_DB_PATH)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                hash TEXT PRIMARY KEY,
+                vec BLOB
+            )
+        ''')
+
+    def _start_batcher(self):
+        """Start the background thread that merges concurrent `embed` calls into batches."""
+        self._requests: Queue = Queue()
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+
+    def _batch_loop(self):
+        """Drain up to EMBED_BATCH_SIZE queued texts (or whatever arrives within MICRO_BATCH_WAIT)."""
+        while True:
+            pending = [self._requests.get()]
+            deadline = time.monotonic() + MICRO_BATCH_WAIT
+            while len(pending) < EMBED_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(self._requests.get(timeout=timeout))
+                except Empty:
+                    break
+
+            try:
+                vectors = self.embed_batch([text for text, _ in pending])
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future) in enumerate(pending):
+                future.set_result(vectors[i] if len(vectors) else np.empty(0, dtype=np.float32))
+
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """Key on model name + text so switching models invalidates old vectors."""
+        return hashlib.sha256(f"{EMBEDDING_MODEL_NAME}\0{text}".encode("utf-8")).hexdigest()
+
+    def _get_cached(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Retrieve cached vectors for the given keys, from memory first, then SQLite."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                vec = self._mem_cache.get(key)
+                if vec is not None:
+                    found[key] = vec
+            keys = [k for k in keys if k not in found]
+
+            from_db = {
+                key: np.frombuffer(blob, dtype=np.int8).astype(np.float32)
+                for key, blob in db.select_in(self.conn, "SELECT hash, vec FROM embeddings WHERE hash IN ({})", keys)
+            }
+            if from_db:
+                # Rows are stored without their int8 scale; re-normalizing restores unit length exactly
+                M = np.stack(list(from_db.values()))
+                M /= np.linalg.norm(M, axis=1, keepdims=True) + 1e-12
+                from_db = dict(zip(from_db, M))
+            self._mem_cache.update(from_db)
+
+        found.update(from_db)
+        return found
+
+    def _save_cached(self, vectors: dict[str, np.ndarray]):
+        """Save freshly computed vectors to the cache in one transaction, int8-quantized (4x smaller rows)."""
+        q, _ = quantize_int8(np.stack(list(vectors.values())))
+        with self._lock, db.transaction(self.conn):
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)',
+                [(key, row.tobytes()) for key, row in zip(vectors, q)],
+            )
+            self._mem_cache.update(vectors)
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Generate a unit-length float32 vector embedding for the given text.
+        Concurrent callers (e.g. several Streamlit sessions) are batched into one model pass.
+        """
+        if not text:
+            return np.empty(0, dtype=np.float32)
+
+        future: Future = Future()
+        self._requests.put((text, future))
+        return future.result()
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for many texts in a single model pass.
+
+        Rows are L2-normalized so cosine similarity reduces to a dot product.
+        Texts seen before are served from the in-memory LRU or SQLite cache; only misses hit the model.
+        Returns an (N, D) float32 array, or an empty array if the model is unavailable.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [self._cache_key(t) for t in texts]
+        vectors = self._get_cached(keys)
+
+        # Unique misses, in first-seen order
+        misses = {k: t for k, t in zip(keys, texts) if k not in vectors}
+        if misses:
+            if not self.model:
+                return np.empty((0, 0), dtype=np.float32)
+
+            M = self._encode(list(misses.values()))
+            M /= np.linalg.norm(M, axis=1, keepdims=True) + 1e-12
+            computed = dict(zip(misses.keys(), M))
+            self._save_cached(computed)
+            vectors.update(computed)
+
+        return np.stack([vectors[k] for k in keys])
+
+    def similarity(self, v1: np.ndarray, v2: np.ndarray) -> float:
+        """Cosine similarity between two unit-length vectors (as returned by `embed`)."""
+        if len(v1) == 0 or len(v2) == 0:
             return 0.0
-            
-        return float(np.dot(vec1, vec2) / (norm1 * norm2))
+
+        return float(np.dot(v1, v2))
+
+    def cosine_batch(self, q: np.ndarray, M: np.ndarray) -> np.ndarray:
+        """Cosine similarity of unit query `q` against every (unit) row of `M`, as an (N,) array."""
+        return M @ q
@@ -1,220 +1,500 @@
 import time
-import sqlite3
-import json
+import random
+import asyncio
 import logging
-import requests
-from typing import List, Dict, Optional
-from .config import DATA_DIR, CACHE_DB_PATH, SEMANTIC_SCHOLAR_RATE_LIMIT
+import threading
+import weakref
+from types import MappingProxyType
+from concurrent.futures import Future
+import httpx
+import orjson
+import zstandard
+from typing import Any, Coroutine, List, Dict, Optional
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from . import db
+from .config import DATA_DIR, CACHE_DB_PATH, SEMANTIC_SCHOLAR_RATE_LIMIT, S2_MAX_CONCURRENCY
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Fields we always want from Semantic Scholar
 PAPER_FIELDS = "paperId,title,abstract,url,year,citationCount,authors,references,citations"
+PAPER_PARAMS = MappingProxyType({"fields": PAPER_FIELDS})  # Shared, read-only query params for detail/batch requests
 S2_API_BASE = "https://api.semanticscholar.org/graph/v1"
+S2_BATCH_LIMIT = 500  # Max IDs per /paper/batch request
+
+# Longest we ever back off before a retry, whatever the server asks for
+MAX_BACKOFF = 60.0  # seconds
+
+# Server errors worth retrying (the API's gateway is flaky under load)
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Decoded papers kept in memory in front of the SQLite cache (LRU)
+PAPER_CACHE_SIZE = 8192
+
+# zstd level for cached paper blobs; abstracts compress ~3x at this level
+CACHE_ZSTD_LEVEL = 3
+
+
+def _encode_cached(data: Dict) -> bytes:
+    """Serialize a paper dict for the cache: orjson, then zstd. References live in `paper_refs`, not the blob."""
+    meta = {k: v for k, v in data.items() if k != "references"}
+    return zstandard.compress(orjson.dumps(meta), CACHE_ZSTD_LEVEL)
+
+
+def _decode_cached(raw) -> Dict:
+    """
+    Inverse of `_encode_cached`. Rows written before the switch are plain JSON text,
+    and older rows may still carry their references inline.
+    """
+    if isinstance(raw, str):
+        return orjson.loads(raw)
+    return orjson.loads(zstandard.decompress(raw))
+
+
+def _parse_paper(paper: Dict, paper_id: Optional[str] = None) -> Dict:
+    """Flatten a Semantic Scholar paper payload into our cached dict format."""
+    return {
+        "id": paper.get("paperId") or paper_id,
+        "title": paper.get("title", ""),
+        "abstract": paper.get("abstract") or "",
+        "url": paper.get("url", ""),
+        "year": paper.get("year"),
+        "citationCount": paper.get("citationCount", 0),
+        "authors": [a.get("name", "") for a in (paper.get("authors") or [])],
+        "references": [
+            ref.get("paperId") for ref in (paper.get("references") or [])
+            if ref.get("paperId")
+        ],
+        "citations": [
+            cit.get("paperId") for cit in (paper.get("citations") or [])
+            if cit.get("paperId")
+        ],
+    }
+
+
+def _backoff(attempt: int, base: float = 2.0) -> float:
+    """Exponential backoff with up to 1s of jitter, capped at MAX_BACKOFF."""
+    return min(MAX_BACKOFF, base * 2 ** attempt) + random.uniform(0, 1)
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After as seconds or an HTTP date), if any."""
+    value = resp.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _RateLimiter:
+    """
+    Spaces request starts `interval` seconds apart. Thread-safe rather than loop-bound,
+    so fetchers running on different I/O loops share one budget.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        await asyncio.sleep(slot - now)
+
+
+# S2 rate-limits per client, so every fetcher shares one limiter
+_rate_limiter = _RateLimiter(SEMANTIC_SCHOLAR_RATE_LIMIT)
 
 
 class ContentFetcher:
-    def __init__(self):
-        self._init_db()
+    def __init__(self, db_path=CACHE_DB_PATH, journal_mode: str = "WAL"):
+        self._init_db(db_path, journal_mode)
+        self._start_io_loop()
+
+    def _start_io_loop(self):
+        """
+        Run all S2 I/O on one long-lived event loop in a background thread. The pooled client and the
+        concurrency semaphore are bound to this loop, so they (and their keep-alive connections) survive
+        across graph runs, prefetches and sync calls instead of being rebuilt per `asyncio.run`.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        threading.Thread(target=self._loop.run_forever, name="s2-io", daemon=True).start()
+        # Stop the loop if the fetcher is dropped without `close`
+        weakref.finalize(self, self._loop.call_soon_threadsafe, self._loop.stop)
 
-    def _init_db(self):
-        """Initialize the SQLite cache."""
-        self.conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+    def _init_db(self, db_path, journal_mode: str):
+        """Initialize the SQLite cache (`db_path=":memory:"` gives a throwaway one)."""
+        # The connection is shared with the agent's prefetch thread
+        self._db_lock = threading.Lock()
+        self._mem_cache = db.LRUCache(PAPER_CACHE_SIZE)
+        self.conn = db.connect(db_path, journal_mode)
         self.cursor = self.conn.cursor()
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS papers (
                 id TEXT PRIMARY KEY,
-                data TEXT,
-                timestamp REAL
+                data BLOB,
+                timestamp REAL,
+                has_abstract INTEGER,
+                has_refs INTEGER
             )
         ''')
-        self.conn.commit()
+        # Caches created before these flags existed get the columns; their rows stay NULL (unknown)
+        columns = {row[1] for row in self.cursor.execute('PRAGMA table_info(papers)')}
+        for column in ('has_abstract', 'has_refs'):
+            if column not in columns:
+                self.cursor.execute(f'ALTER TABLE papers ADD COLUMN {column} INTEGER')
+        # Reference lists, one row per edge in S2 order; the primary key doubles as the paper_id index
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS paper_refs (
+                paper_id TEXT,
+                pos INTEGER,
+                ref_id TEXT,
+                PRIMARY KEY (paper_id, pos)
+            ) WITHOUT ROWID
+        ''')
+        # For age-based eviction / refresh queries
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_papers_ts ON papers(timestamp)')
+
+    def close(self):
+        """Close the HTTP client, stop the I/O loop and close the cache connection (runs PRAGMA optimize first)."""
+        if self._loop.is_running():
+            if self._http is not None:
+                self.submit(self._http.aclose()).result(timeout=5)
+                self._http = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        with self._db_lock:
+            if self.conn is not None:
+                db.close(self.conn)
+                self.conn = None
 
     def _get_from_cache(self, paper_id: str) -> Optional[Dict]:
-        """Retrieve paper data from cache."""
-        self.cursor.execute('SELECT data FROM papers WHERE id = ?', (paper_id,))
-        row = self.cursor.fetchone()
-        if row:
-            return json.loads(row[0])
-        return None
+        """Retrieve paper data (with references, if cached) from memory first, then SQLite."""
+        return self._get_many_from_cache([paper_id], with_references=True).get(paper_id)
+
+    def _get_many_from_cache(self, paper_ids: List[str], require_abstract: bool = False,
+                             with_references: bool = False) -> Dict[str, Dict]:
+        """
+        Retrieve cached papers for many IDs (memory first, then chunked IN queries), keyed by ID.
+        With `require_abstract`, rows known to lack an abstract are skipped without being decoded.
+        With `with_references`, papers fetched with full details get their `references` list joined in.
+        """
+        found = {}
+        with self._db_lock:
+            for pid in paper_ids:
+                cached = self._mem_cache.get(pid)
+                # A metadata-only entry can't answer a references lookup, that goes to SQLite
+                if cached is not None and (not with_references or "references" in cached):
+                    found[pid] = cached
+            paper_ids = [pid for pid in paper_ids if pid not in found]
+
+            # NULL means a row from before has_abstract existed, so let it through
+            gate = " AND has_abstract IS NOT 0" if require_abstract else ""
+            from_db = {}
+            has_refs = []
+            for pid, data, refs_flag in db.select_in(
+                self.conn, f"SELECT id, data, has_refs FROM papers WHERE id IN ({{}}){gate}", paper_ids
+            ):
+                from_db[pid] = _decode_cached(data)
+                if refs_flag:
+                    has_refs.append(pid)
+
+            if with_references and has_refs:
+                for pid, refs in self._load_refs(has_refs).items():
+                    from_db[pid]["references"] = refs
+                for pid in has_refs:
+                    from_db[pid].setdefault("references", [])
+            self._mem_cache.update(from_db)
+
+        found.update(from_db)
+        return found
+
+    def _load_refs(self, paper_ids: List[str]) -> Dict[str, List[str]]:
+        """Reference IDs for many papers from `paper_refs`, in S2 order. Caller holds `self._db_lock`."""
+        refs: Dict[str, List[str]] = {}
+        for pid, ref_id in db.select_in(
+            self.conn, "SELECT paper_id, ref_id FROM paper_refs WHERE paper_id IN ({}) ORDER BY paper_id, pos", paper_ids
+        ):
+            refs.setdefault(pid, []).append(ref_id)
+        return refs
+
+    def get_neighbors(self, paper_id: str) -> List[str]:
+        """Cached reference IDs of a paper, in S2 order. An index lookup, no blob decode."""
+        with self._db_lock:
+            self.cursor.execute('SELECT ref_id FROM paper_refs WHERE paper_id = ? ORDER BY pos', (paper_id,))
+            return [row[0] for row in self.cursor.fetchall()]
 
     def _save_to_cache(self, paper_id: str, data: Dict):
         """Save paper data to cache."""
-        self.cursor.execute('INSERT OR REPLACE INTO papers (id, data, timestamp) VALUES (?, ?, ?)',
-                            (paper_id, json.dumps(data), time.time()))
-        self.conn.commit()
+        self._save_many_to_cache([{**data, "id": paper_id}])
+
+    def _save_many_to_cache(self, papers: List[Dict]):
+        """
+        Save several papers in one transaction (one commit instead of one per row).
+        References go to `paper_refs`; a save with references replaces the paper's old edges,
+        a save without them (e.g. a search result) keeps whatever edges and `has_refs` it had.
+        """
+        papers = list({p["id"]: p for p in papers}.values())  # One version per ID, or the edge inserts would clash
+        with_refs = [p for p in papers if "references" in p]
+        now = time.time()
+        rows = [
+            (p["id"], _encode_cached(p), now, int(bool(p.get("abstract"))), 1 if "references" in p else None)
+            for p in papers
+        ]
+        edges = [(p["id"], pos, ref) for p in with_refs for pos, ref in enumerate(p["references"])]
+        with self._db_lock, db.transaction(self.conn):
+            self.cursor.executemany(
+                '''
+                INSERT INTO papers (id, data, timestamp, has_abstract, has_refs) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    data = excluded.data,
+                    timestamp = excluded.timestamp,
+                    has_abstract = excluded.has_abstract,
+                    has_refs = COALESCE(excluded.has_refs, papers.has_refs)
+                ''',
+                rows,
+            )
+            self.cursor.executemany('DELETE FROM paper_refs WHERE paper_id = ?', [(p["id"],) for p in with_refs])
+            self.cursor.executemany('INSERT INTO paper_refs (paper_id, pos, ref_id) VALUES (?, ?, ?)', edges)
+            self._mem_cache.update({p["id"]: p for p in papers})  # Write-through, so the next read skips SQLite and the decode
+
+    def _split_cached(self, paper_ids: List[str], need_references: bool = False):
+        """Partition IDs into usable cache hits and IDs that still need fetching."""
+        cached_all = self._get_many_from_cache(paper_ids, require_abstract=True, with_references=need_references)
+        results = []
+        to_fetch = []
+        for pid in paper_ids:
+            cached = cached_all.get(pid)
+            # Search results are cached without references, so they don't count as full details
+            if cached and cached.get("abstract") and (not need_references or "references" in cached):
+                results.append(cached)
+            else:
+                to_fetch.append(pid)
+        return results, to_fetch
+
+    def _parse_search_results(self, body: Dict) -> List[Dict]:
+        """Turn a /paper/search response into paper dicts, caching each one."""
+        raw_items = body.get("data", [])
+
+        if not raw_items:
+            logger.warning("Semantic Scholar returned 0 results for this query.")
+            return []
+
+        papers = []
+        skipped_no_abstract = 0
+        for item in raw_items:
+            abstract = item.get("abstract") or ""
+            if not abstract:
+                skipped_no_abstract += 1
+
+            paper_data = {
+                "id": item.get("paperId", ""),
+                "title": item.get("title", ""),
+                "abstract": abstract,
+                "url": item.get("url", ""),
+                "year": item.get("year"),
+                "citationCount": item.get("citationCount", 0),
+                "authors": [a.get("name", "") for a in (item.get("authors") or [])],
+            }
+            if paper_data["id"]:
+                papers.append(paper_data)
+
+        self._save_many_to_cache(papers)
+
+        logger.info(
+            f"Search returned {len(papers)} papers "
+            f"({skipped_no_abstract} without abstracts, kept anyway for metadata)."
+        )
+        return papers
+
+    # --- Sync wrappers (for scripts; the agent uses the async API) ---
 
     def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Blocking version of `search_async`."""
+        return self.submit(self._search(query, limit)).result()
+
+    def get_details(self, paper_id: str) -> Optional[Dict]:
+        """Blocking version of `get_details_async`."""
+        return self.submit(self._get_details(paper_id)).result()
+
+    def get_batch_details(self, paper_ids: List[str], need_references: bool = False) -> List[Dict]:
+        """Blocking version of `get_batch_details_async`."""
+        return self.submit(self._get_batch_details(paper_ids, need_references)).result()
+
+    # --- Async API (awaitable from any event loop; the work runs on the fetcher's I/O loop) ---
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule `coro` on the fetcher's I/O loop from any thread (e.g. background prefetches)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _on_io_loop(self, coro: Coroutine) -> Any:
+        """Await `coro` on the I/O loop from the caller's loop."""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def search_async(self, query: str, limit: int = 10) -> List[Dict]:
         """
         Search for papers by keyword using the Semantic Scholar API directly.
         Explicitly requests abstracts via the 'fields' parameter.
         Returns a list of paper dicts, or raises on unrecoverable failure.
         """
-        logger.info(f"Searching for: '{query}' (limit={limit})")
+        return await self._on_io_loop(self._search(query, limit))
 
-        url = f"{S2_API_BASE}/paper/search"
-        params = {
-            "query": query,
-            "limit": limit,
-            "fields": PAPER_FIELDS,
-        }
+    async def get_details_async(self, paper_id: str) -> Optional[Dict]:
+        """Get details for a specific paper ID. Safe to fan out with `asyncio.gather`."""
+        return await self._on_io_loop(self._get_details(paper_id))
 
-        last_error = None
+    async def get_batch_details_async(self, paper_ids: List[str], need_references: bool = False) -> List[Dict]:
+        """
+        Get details for multiple papers. Uses POST batch endpoint, falls back to concurrent individual fetches.
+        Set `need_references` when the caller will expand the papers, so cached search
+        results (which lack references) are refetched.
+        """
+        return await self._on_io_loop(self._get_batch_details(paper_ids, need_references))
+
+    # --- I/O loop internals ---
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency cap for S2 requests (created on, and bound to, the I/O loop)."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(S2_MAX_CONCURRENCY)
+        return self._sem
+
+    def _client(self) -> httpx.AsyncClient:
+        """
+        Pooled keep-alive client on the I/O loop, so TLS handshakes are paid once.
+        HTTP/2 lets concurrent requests share one connection instead of opening one each.
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=S2_API_BASE,
+                http2=True,
+                timeout=20,
+                limits=httpx.Limits(
+                    max_connections=S2_MAX_CONCURRENCY,
+                    max_keepalive_connections=S2_MAX_CONCURRENCY // 2,
+                ),
+            )
+        return self._http
+
+    async def _request(self, method: str, path: str, timeout: float, **kwargs) -> httpx.Response:
+        """
+        Send one S2 request under the shared rate limit and the concurrency cap.
+        429s are retried after the server's Retry-After (or a jittered exponential backoff);
+        transport errors and 5xx responses after a shorter jittered backoff.
+        The last response is returned (or the last transport error raised) once retries run out.
+        """
         for attempt in range(3):
+            await _rate_limiter.wait()
             try:
-                time.sleep(SEMANTIC_SCHOLAR_RATE_LIMIT)  # Pre-delay to avoid 429
-                resp = requests.get(url, params=params, timeout=20)
-
-                if resp.status_code == 429:
-                    wait = (attempt + 1) * 10
-                    logger.warning(f"Rate limited (429). Waiting {wait}s before retry {attempt+1}/3...")
-                    time.sleep(wait)
-                    continue
-
-                resp.raise_for_status()
-                body = resp.json()
-                raw_items = body.get("data", [])
-
-                if not raw_items:
-                    logger.warning("Semantic Scholar returned 0 results for this query.")
-                    return []
-
-                papers = []
-                skipped_no_abstract = 0
-                for item in raw_items:
-                    abstract = item.get("abstract") or ""
-                    if not abstract:
-                        skipped_no_abstract += 1
-
-                    paper_data = {
-                        "id": item.get("paperId", ""),
-                        "title": item.get("title", ""),
-                        "abstract": abstract,
-                        "url": item.get("url", ""),
-                        "year": item.get("year"),
-                        "citationCount": item.get("citationCount", 0),
-                        "authors": [a.get("name", "") for a in (item.get("authors") or [])],
-                    }
-                    if paper_data["id"]:
-                        self._save_to_cache(paper_data["id"], paper_data)
-                        papers.append(paper_data)
-
-                logger.info(
-                    f"Search returned {len(papers)} papers "
-                    f"({skipped_no_abstract} without abstracts, kept anyway for metadata)."
-                )
-                return papers
-
-            except requests.exceptions.HTTPError as e:
-                last_error = e
-                logger.error(f"HTTP error on attempt {attempt+1}: {e}")
-            except Exception as e:
-                last_error = e
-                logger.error(f"Search failed on attempt {attempt+1}: {e}")
-                # Short backoff before retry for non-429 errors
-                time.sleep(3)
-
-        # If we exhausted retries, raise so the caller knows
-        raise RuntimeError(
-            f"Search failed after 3 retries. Last error: {last_error}"
-        )
+                async with self._semaphore():
+                    resp = await self._client().request(method, path, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == 2:
+                    raise
+                wait = _backoff(attempt)
+                logger.warning(f"Request to {path} failed ({e}). Waiting {wait:.1f}s before retry {attempt+1}/3...")
+                await asyncio.sleep(wait)
+                continue
 
-    def get_details(self, paper_id: str) -> Optional[Dict]:
-        """Get details for a specific paper ID."""
+            if attempt == 2:
+                return resp
+            if resp.status_code == 429:
+                hint = _retry_after(resp)
+                wait = min(MAX_BACKOFF, hint) + random.uniform(0, 1) if hint is not None else _backoff(attempt, base=10.0)
+                logger.warning(f"Rate limited (429). Waiting {wait:.1f}s before retry {attempt+1}/3...")
+            elif resp.status_code in RETRY_STATUSES:
+                wait = _backoff(attempt)
+                logger.warning(f"Server error ({resp.status_code}) on {path}. Waiting {wait:.1f}s before retry {attempt+1}/3...")
+            else:
+                return resp
+            await asyncio.sleep(wait)
+
+    async def _search(self, query: str, limit: int) -> List[Dict]:
+        """`search_async` on the I/O loop."""
+        logger.info(f"Searching for: '{query}' (limit={limit})")
+
+        params = {**PAPER_PARAMS, "query": query, "limit": limit}
+
+        try:
+            # `_request` already retries 429s, 5xx and transport errors
+            resp = await self._request("GET", "/paper/search", timeout=20, params=params)
+            resp.raise_for_status()
+            return self._parse_search_results(orjson.loads(resp.content))
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            # Raise so the caller knows
+            raise RuntimeError(f"Search failed after 3 retries. Last error: {e}") from e
+
+    async def _get_details(self, paper_id: str) -> Optional[Dict]:
+        """`get_details_async` on the I/O loop."""
         cached = self._get_from_cache(paper_id)
-        if cached and cached.get("abstract"):
+        # Search results are cached without references, so they don't count as full details
+        if cached and cached.get("abstract") and "references" in cached:
             return cached
 
         try:
-            time.sleep(SEMANTIC_SCHOLAR_RATE_LIMIT)
-            url = f"{S2_API_BASE}/paper/{paper_id}"
-            params = {"fields": PAPER_FIELDS}
-            resp = requests.get(url, params=params, timeout=20)
+            resp = await self._request(
+                "GET", f"/paper/{paper_id}", timeout=20, params=PAPER_PARAMS
+            )
 
             if resp.status_code == 429:
                 logger.warning(f"Rate limited fetching {paper_id}, skipping.")
                 return cached  # Return stale cache if available
             resp.raise_for_status()
 
-            paper = resp.json()
-            data = {
-                "id": paper.get("paperId", paper_id),
-                "title": paper.get("title", ""),
-                "abstract": paper.get("abstract") or "",
-                "url": paper.get("url", ""),
-                "year": paper.get("year"),
-                "citationCount": paper.get("citationCount", 0),
-                "authors": [a.get("name", "") for a in (paper.get("authors") or [])],
-                "references": [
-                    ref.get("paperId") for ref in (paper.get("references") or [])
-                    if ref.get("paperId")
-                ],
-                "citations": [
-                    cit.get("paperId") for cit in (paper.get("citations") or [])
-                    if cit.get("paperId")
-                ],
-            }
+            data = _parse_paper(orjson.loads(resp.content), paper_id)
             self._save_to_cache(data["id"], data)
             return data
         except Exception as e:
             logger.error(f"Failed to fetch paper {paper_id}: {e}")
             return cached  # Return stale cache if we have it
 
-    def get_batch_details(self, paper_ids: List[str]) -> List[Dict]:
-        """Get details for multiple papers. Uses POST batch endpoint, falls back to individual fetches."""
-        results = []
-        to_fetch = []
-
+    async def _get_batch_details(self, paper_ids: List[str], need_references: bool) -> List[Dict]:
+        """`get_batch_details_async` on the I/O loop."""
         # Check cache first
-        for pid in paper_ids:
-            cached = self._get_from_cache(pid)
-            if cached and cached.get("abstract"):
-                results.append(cached)
-            else:
-                to_fetch.append(pid)
+        results, to_fetch = self._split_cached(paper_ids, need_references)
 
         if not to_fetch:
             return results
 
         logger.info(f"Fetching batch of {len(to_fetch)} papers...")
 
+        # The batch endpoint takes at most S2_BATCH_LIMIT IDs; larger sets go out as concurrent chunks
+        chunks = await asyncio.gather(*(
+            self._post_batch(to_fetch[i:i + S2_BATCH_LIMIT])
+            for i in range(0, len(to_fetch), S2_BATCH_LIMIT)
+        ))
+        for fetched in chunks:
+            results.extend(fetched)
+
+        return results
+
+    async def _post_batch(self, paper_ids: List[str]) -> List[Dict]:
+        """Fetch up to S2_BATCH_LIMIT papers in one POST, falling back to individual fetches."""
         try:
-            time.sleep(SEMANTIC_SCHOLAR_RATE_LIMIT)
-            url = f"{S2_API_BASE}/paper/batch"
-            params = {"fields": PAPER_FIELDS}
-            body = {"ids": to_fetch}
-            resp = requests.post(url, params=params, json=body, timeout=30)
+            resp = await self._request(
+                "POST", "/paper/batch", timeout=30,
+                params=PAPER_PARAMS, json={"ids": paper_ids},
+            )
             resp.raise_for_status()
 
-            for paper in resp.json():
-                if not paper or not paper.get("paperId"):
-                    continue
-                data = {
-                    "id": paper.get("paperId"),
-                    "title": paper.get("title", ""),
-                    "abstract": paper.get("abstract") or "",
-                    "url": paper.get("url", ""),
-                    "year": paper.get("year"),
-                    "citationCount": paper.get("citationCount", 0),
-                    "authors": [a.get("name", "") for a in (paper.get("authors") or [])],
-                    "references": [
-                        ref.get("paperId") for ref in (paper.get("references") or [])
-                        if ref.get("paperId")
-                    ],
-                    "citations": [
-                        cit.get("paperId") for cit in (paper.get("citations") or [])
-                        if cit.get("paperId")
-                    ],
-                }
-                self._save_to_cache(data["id"], data)
-                results.append(data)
+            fetched = [_parse_paper(paper) for paper in orjson.loads(resp.content) if paper and paper.get("paperId")]
+            self._save_many_to_cache(fetched)
+            return fetched
         except Exception as e:
             logger.warning(f"Batch fetch failed ({e}), falling back to individual fetches...")
-            for pid in to_fetch:
-                res = self.get_details(pid)
-                if res:
-                    results.append(res)
-
-        return results
+            fetched = await asyncio.gather(*(self._get_details(pid) for pid in paper_ids))
+            return [res for res in fetched if res]
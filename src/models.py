@@ -1,5 +1,12 @@
-from typing import List, Dict, Set, Optional, TypedDict, Annotated
+from typing import List, Dict, Optional, TypedDict, Annotated
+from concurrent.futures import Future
 import operator
+import numpy as np
+
+def merge_dicts(current: Dict, new: Dict) -> Dict:
+    """State reducer: merge a node's new entries into the existing dict in place."""
+    current.update(new)
+    return current
 
 class Paper(TypedDict):
     """Represents a single research paper."""
@@ -10,26 +17,84 @@ class Paper(TypedDict):
     year: int
     citation_count: int
     url: str
-    vector: Optional[List[float]] = None  # Embedding vector
     relevance_score: float = 0.0
     summary: str = ""  # RAG-generated summary
 
+class PaperStore:
+    """
+    Struct-of-arrays view of the found papers; row i belongs to ids[i].
+    Columns are over-allocated and doubled when full, so appending a batch is amortized O(batch).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.ids: List[str] = []
+        self._scores = np.zeros(capacity, dtype=np.float32)  # Relevance scores
+        self._visited = np.zeros(capacity, dtype=bool)  # True once a paper has been expanded
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # Views of the filled rows
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores[:len(self)]
+
+    @property
+    def visited(self) -> np.ndarray:
+        return self._visited[:len(self)]
+
+    def _reserve(self, size: int):
+        """Grow every column to hold at least `size` rows."""
+        capacity = len(self._scores)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in ("_scores", "_visited"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(self)] = old[:len(self)]
+            setattr(self, name, new)
+
+    def add(self, ids: List[str], scores: np.ndarray):
+        """Append rows for new (not yet stored) papers, in the given order."""
+        start, end = len(self), len(self) + len(ids)
+        self._reserve(end)
+        self._scores[start:end] = scores
+        self._visited[start:end] = False
+        self.ids.extend(ids)
+
+    def mark_visited(self, rows: List[int]):
+        self._visited[rows] = True
+
+    def top_unvisited(self, k: int) -> List[int]:
+        """Rows of the top-k unvisited papers by score, most relevant first, via argpartition."""
+        scores = self.scores
+        candidates = np.flatnonzero(~self.visited)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        # Only the k winners get sorted (stable, so ties keep discovery order)
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return candidates.tolist()
+
 class ResearchState(TypedDict):
     """
     The state of the research agent.
     Managed by LangGraph to track progress.
     """
     query: str  # The original user query/abstract
-    query_vector: List[float]  # Embedding of the query
+    query_vector: np.ndarray  # float32 embedding of the query
+    
+    # Nodes return only newly found papers; the reducers append them to what we have
+    papers: Annotated[Dict[str, Paper], merge_dicts]  # All found papers, keyed by ID
     
-    papers: Dict[str, Paper]  # All found papers, keyed by ID
+    # Struct-of-arrays columns for the papers (scores, visited), mutated in place by the nodes
+    store: PaperStore
     
-    # Queue of Paper IDs to process in the next step
-    # We use a list for the queue to maintain order
-    queue: List[str] 
+    # Rows (into store) to expand in the next step, most relevant first (chosen by filter_node)
+    next_batch: List[int]
     
-    # Set of IDs we have already processed/expanded
-    visited_ids: Set[str]
+    # This run's in-flight prefetch of the seeds' references, awaited by the first expand_node
+    prefetched: Optional[Future]
     
     current_depth: int
     max_depth: int
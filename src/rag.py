@@ -1,8 +1,9 @@
 import google.generativeai as genai
+import asyncio
 import os
 import logging
 from typing import List, Dict
-from .config import LLM_MODEL_NAME
+from .config import LLM_MODEL_NAME, RAG_MAX_PAPERS, RAG_ABSTRACT_CHARS
 
 logger = logging.getLogger(__name__)
 
@@ -16,36 +17,54 @@ class RAGClient:
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(LLM_MODEL_NAME)
 
-    def summarize_papers(self, papers: List[Dict], query: str) -> str:
-        """
-        Generate a synthesis of the provided papers related to the query.
-        """
-        if not self.model:
-            return "RAG Disabled: No API Key provided."
-            
-        if not papers:
-            return "No papers found to summarize."
-
-        # Construct Prompt
-        context = "\n\n".join([
-            f"Title: {p['title']}\nYear: {p['year']}\nAbstract: {p['abstract']}" 
-            for p in papers[:10]  # Limit context window
-        ])
-        
-        prompt = f"""
+    def _build_prompt(self, papers: List[Dict], query: str) -> str:
+        """Build the synthesis prompt from the top papers."""
+        # Construct Prompt in one buffer, joined once at the end
+        buf = []
+        append = buf.append
+        append(f"""
         You are a research assistant. The user is investigating: "{query}".
         
         Here are the most relevant papers found:
         
-        {context}
+        """)
+        for i, p in enumerate(papers[:RAG_MAX_PAPERS]):  # Limit context window
+            if i:
+                append("\n\n")
+            abstract = p['abstract']
+            if len(abstract) > RAG_ABSTRACT_CHARS:
+                abstract = abstract[:RAG_ABSTRACT_CHARS] + "..."
+            append("Title: ")
+            append(p['title'])
+            append("\nYear: ")
+            append(str(p['year']))
+            append("\nAbstract: ")
+            append(abstract)
+        append("""
         
         Synthesize these findings into a concise 1-paragraph summary. 
         Highlight the key themes and how they relate to the user's query.
+        """)
+        return "".join(buf)
+
+    async def asummarize(self, papers: List[Dict], query: str) -> str:
         """
-        
+        Generate a synthesis of the provided papers related to the query.
+        Awaits Gemini without blocking the event loop, so independent summaries can run with `asyncio.gather`.
+        """
+        if not self.model:
+            return "RAG Disabled: No API Key provided."
+
+        if not papers:
+            return "No papers found to summarize."
+
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(self._build_prompt(papers, query))
             return response.text
         except Exception as e:
             logger.error(f"RAG Generation failed: {e}")
             return "Failed to generate summary."
+
+    def summarize_papers(self, papers: List[Dict], query: str) -> str:
+        """Blocking version of `asummarize`, for callers outside an event loop."""
+        return asyncio.run(self.asummarize(papers, query))
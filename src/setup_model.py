@@ -1,25 +1,32 @@
-from fastembed import TextEmbedding
+import sys
+import os
 import logging
 import time
 
+# Add project root to path so we can import packages from src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import EMBEDDING_MODEL_NAME, EMBED_BATCH_SIZE
+from src.embeddings import load_model
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def download_model():
-    model_name = "BAAI/bge-small-en-v1.5"
+    model_name = EMBEDDING_MODEL_NAME
     logger.info(f"Starting download for: {model_name}")
     start = time.time()
-    
+
     try:
-        # This triggers the download
-        model = TextEmbedding(model_name=model_name)
-        # Test it
-        vec = list(model.embed(["Hello world"]))
-        
+        # This triggers the download (on the GPU provider if onnxruntime-gpu is installed)
+        model = load_model(model_name)
+        # Test it with one full batch, the way the agent embeds abstracts
+        vecs = list(model.embed(["Hello world"] * EMBED_BATCH_SIZE, batch_size=EMBED_BATCH_SIZE))
+
         duration = time.time() - start
-        logger.info(f"Model downloaded and verified in {duration:.2f} seconds.")
+        logger.info(f"Model downloaded and verified in {duration:.2f} seconds ({len(vecs[0])}-dim vectors).")
         logger.info("You can now restart the Streamlit app.")
-        
+
     except Exception as e:
         logger.error(f"Failed to download model: {e}")
 
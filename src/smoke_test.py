@@ -1,11 +1,11 @@
 import sys
-try:
-    import langgraph
-    import sentence_transformers
-    import semanticscholar
-    import networkx
-    import streamlit
-    print("SUCCESS: All dependencies imported.")
-except ImportError as e:
-    print(f"FAILURE: {e}")
+import importlib.util
+
+# find_spec only locates the packages, so nothing heavy gets imported
+REQUIRED = ["langgraph", "fastembed", "numpy", "httpx", "orjson", "zstandard", "networkx", "pyvis", "streamlit"]
+
+missing = [name for name in REQUIRED if importlib.util.find_spec(name) is None]
+if missing:
+    print(f"FAILURE: Missing dependencies: {', '.join(missing)}")
     sys.exit(1)
+print("SUCCESS: All dependencies found.")
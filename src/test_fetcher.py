@@ -4,7 +4,8 @@ import logging
 logging.basicConfig(level=logging.INFO)
 
 def test_fetcher():
-    fetcher = ContentFetcher()
+    # Throwaway in-memory cache: no disk flushes, and every run really hits the API
+    fetcher = ContentFetcher(db_path=":memory:", journal_mode="MEMORY")
     
     print("Testing get_details...")
     # Test with a known paper ID (Attention is All You Need)